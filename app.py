@@ -3,35 +3,387 @@ YouTube Downloader Flask Application
 A web application to download YouTube videos and audio in various formats
 """
 
-from flask import Flask, render_template, request, jsonify, send_file
+from flask import Flask, Response, render_template, request, jsonify, send_file
+from flask.json.provider import DefaultJSONProvider
 from flask_cors import CORS
+from cachetools import TTLCache, cached
+from concurrent.futures import ThreadPoolExecutor, TimeoutError as FuturesTimeoutError, as_completed
+from contextlib import contextmanager
+import copy
+from dataclasses import dataclass
+from operator import attrgetter
+import functools
+import hashlib
+import logging
+import mimetypes
+import unicodedata
+import orjson
 import yt_dlp
+from yt_dlp.networking import Request
+from yt_dlp.postprocessor import PostProcessor
+from urllib.parse import quote
+from werkzeug.utils import safe_join
 import os
 import re
+import secrets
+import shutil
+import socket
+import threading
+import time
 from pathlib import Path
+from typing import Optional
+
+try:
+    import av
+except ImportError:  # PyAV is optional, ffmpeg does the remuxing without it
+    av = None
+
+
+class OrjsonProvider(DefaultJSONProvider):
+    """
+    JSON provider that serializes with orjson instead of the json module
+    
+    Used by jsonify and request.get_json. Types orjson does not handle
+    natively fall back to Flask's default conversions.
+    """
+
+    def dumps(self, obj, **kwargs):
+        return orjson.dumps(obj, default=self.default).decode()
+
+    def loads(self, s, **kwargs):
+        return orjson.loads(s)
+
+
+class AvRemuxPP(PostProcessor):
+    """
+    Remux a download into mp4 in-process with PyAV
+    
+    Packets are copied without decoding, like ffmpeg -c copy, but without
+    launching an ffmpeg process for every download.
+    """
+
+    def run(self, info):
+        path = info['filepath']
+        if info.get('ext') == 'mp4':
+            self.to_screen(f'Not remuxing media file "{path}"; already is in target format mp4')
+            return [], info
+
+        root = os.path.splitext(path)[0]
+        temp_path = root + '.temp.mp4'
+        self.to_screen(f'Remuxing "{path}" into mp4')
+        try:
+            with av.open(path) as source, av.open(temp_path, 'w', format='mp4') as target:
+                streams = [s for s in source.streams if s.type in ('video', 'audio')]
+                if hasattr(target, 'add_stream_from_template'):
+                    mapping = {s.index: target.add_stream_from_template(s) for s in streams}
+                else:  # PyAV < 14
+                    mapping = {s.index: target.add_stream(template=s) for s in streams}
+                for packet in source.demux(streams):
+                    # Skip the empty flush packets. Real packets may lack a dts,
+                    # e.g. leading B-frame packets from Matroska; the muxer
+                    # fills it in.
+                    if packet.size == 0:
+                        continue
+                    packet.stream = mapping[packet.stream.index]
+                    target.mux(packet)
+        except (ValueError, av.error.FFmpegError) as e:
+            # e.g. a codec the mp4 container does not support; keep the original
+            if os.path.exists(temp_path):
+                os.remove(temp_path)
+            self.report_warning(f'Could not remux "{path}" into mp4: {e}')
+            return [], info
+
+        new_path = root + '.mp4'
+        os.replace(temp_path, new_path)
+        info['filepath'] = new_path
+        info['ext'] = 'mp4'
+        return [path], info
+
 
 # Initialize Flask app
 app = Flask(__name__)
+app.json = OrjsonProvider(app)
 CORS(app)  # Enable CORS for API requests
 
+logger = logging.getLogger(__name__)
+
 # Configuration
 DOWNLOAD_FOLDER = 'downloads'
 # Create downloads folder if it doesn't exist
 Path(DOWNLOAD_FOLDER).mkdir(exist_ok=True)
+# When running behind nginx, set this to an internal location that aliases
+# DOWNLOAD_FOLDER (e.g. '/internal-downloads/') to let nginx send the files
+X_ACCEL_REDIRECT_PREFIX = os.environ.get('X_ACCEL_REDIRECT_PREFIX')
+# Every download gets its own job directory inside DOWNLOAD_FOLDER. A
+# background sweeper deletes job directories once they are older than
+# DOWNLOAD_MAX_AGE seconds, checked every SWEEP_INTERVAL seconds
+DOWNLOAD_MAX_AGE = 300
+SWEEP_INTERVAL = 60
+# Batch downloads are kept until fetched through /api/files, at most this long
+BATCH_FILE_MAX_AGE = 3600
+
+# Cache of extracted video metadata, keyed by YouTube video ID.
+# Each entry holds the raw yt-dlp info dict and the JSON sent to the frontend.
+VIDEO_INFO_TTL = 3600  # seconds
+VIDEO_INFO_CACHE = TTLCache(maxsize=256, ttl=VIDEO_INFO_TTL)
+# TTLCache is not thread-safe, so every access goes through this lock
+_video_info_cache_lock = threading.Lock()
+# Seconds browsers and proxies may reuse a /api/video-info response
+VIDEO_INFO_MAX_AGE = 600
+
+# A YouTube video URL, capturing the 11-character video ID
+_YOUTUBE_URL_RE = re.compile(
+    r'^(?:https?://)?(?:www\.|m\.|music\.)?'
+    r'(?:youtube\.com/(?:watch\?(?:[^#]*?&)?v=|embed/|shorts/|live/)|youtu\.be/)'
+    r'(?P<id>[\w-]{11})(?![\w-])'
+)
+# A video quality such as '720p'
+_QUALITY_RE = re.compile(r'^(\d{3,4})p?$')
+# Characters not allowed in file names, for use with str.translate
+_INVALID_FILENAME_CHARS = str.maketrans('', '', '<>:"/\\|?*')
+
+# yt-dlp option profiles
+USER_AGENT = 'Mozilla/5.0 (Windows NT 10.0; Win64; x64) AppleWebKit/537.36 (KHTML, like Gecko) Chrome/120.0.0.0 Safari/537.36'
+
+# Ask YouTube's player API as the iOS client only, which needs no player JS
+# for signatures, and skip the HLS/DASH manifests and translated subtitles.
+# yt-dlp would otherwise query several clients per video.
+YOUTUBE_EXTRACTOR_ARGS = {
+    'youtube': {
+        'player_client': ['ios'],
+        'skip': ['hls', 'dash', 'translated_subs'],
+    },
+}
+
+YDL_PROFILES = {
+    # Fetching info only
+    'info': {
+        'quiet': True,
+        'no_warnings': True,
+        'extract_flat': False,
+        'user_agent': USER_AGENT,
+        'nocheckcertificate': True,
+        'age_limit': None,
+        'format': 'all',
+        'color': 'no_color',
+        'extractor_args': YOUTUBE_EXTRACTOR_ARGS,
+    },
+    # Fetching info with yt-dlp's default clients, for ?full=1
+    'info_full': {
+        'quiet': True,
+        'no_warnings': True,
+        'extract_flat': False,
+        'user_agent': USER_AGENT,
+        'nocheckcertificate': True,
+        'age_limit': None,
+        'format': 'all',
+        'color': 'no_color',
+    },
+    # Audio-only download (MP3)
+    'audio': {
+        'format': 'bestaudio/best',
+        'postprocessors': [{
+            'key': 'FFmpegExtractAudio',
+            'preferredcodec': 'mp3',
+            'preferredquality': '192',
+        }],
+        # Relative to the job directory, set in paths['home'] per download
+        'outtmpl': '%(title)s.%(ext)s',
+        'quiet': False,
+        'user_agent': USER_AGENT,
+        'nocheckcertificate': True,
+        'age_limit': None,
+        # Keep the download time as mtime
+        'updatetime': False,
+        'color': 'no_color',
+        'extractor_args': YOUTUBE_EXTRACTOR_ARGS,
+    },
+    # Video download, the format is selected per request
+    'video': {
+        'outtmpl': '%(title)s.%(ext)s',
+        'merge_output_format': 'mp4',
+        'quiet': False,
+        'user_agent': USER_AGENT,
+        'nocheckcertificate': True,
+        'age_limit': None,
+        'updatetime': False,
+        'color': 'no_color',
+        'extractor_args': YOUTUBE_EXTRACTOR_ARGS,
+        # Merged downloads are already mp4; this only rewraps single-file
+        # downloads in other containers, copying the streams without re-encoding.
+        # With PyAV installed AvRemuxPP does this instead, see borrow_ydl.
+        'postprocessors': [] if av else [{
+            'key': 'FFmpegVideoRemuxer',
+            'preferedformat': 'mp4',
+        }],
+    },
+}
+
+# Absolute paths of the job directories of downloads in progress, which the
+# sweeper leaves alone
+_active_downloads = set()
+# Job directories of batch outputs not fetched yet, mapping absolute path to
+# expiry time
+_unfetched_files = {}
+_download_files_lock = threading.Lock()
+
+# Idle YoutubeDL instances per profile. Reusing them keeps yt-dlp's HTTP
+# connections (and cookie jars, extractor state) alive between requests.
+_idle_ydl = {profile: [] for profile in YDL_PROFILES}
+_idle_ydl_lock = threading.Lock()
+
+# yt-dlp jobs run on a shared thread pool. At most YTDL_MAX_JOBS of them talk
+# to YouTube at once to avoid getting rate-limited.
+YTDL_EXECUTOR = ThreadPoolExecutor(max_workers=16, thread_name_prefix='ytdl')
+YTDL_MAX_JOBS = 8
+_ytdl_slots = threading.BoundedSemaphore(YTDL_MAX_JOBS)
+# Info extractions in progress, keyed by (video ID, full), so concurrent
+# requests for the same video share a single extraction
+_inflight_info = {}
+_inflight_info_lock = threading.Lock()
+# Downloads in progress, keyed by (video ID, format, format ID), so a retry
+# after a 504 joins the download still running
+_inflight_downloads = {}
+_inflight_downloads_lock = threading.Lock()
+# Seconds a request waits for video info before answering 504
+VIDEO_INFO_TIMEOUT = 60
+# Seconds a request waits for a download before answering 504
+DOWNLOAD_TIMEOUT = 600
 
+# Batch downloads run on their own pool so a large batch cannot starve the
+# interactive routes; 4 parallel downloads saturate most links without
+# triggering YouTube's rate limiting
+BATCH_EXECUTOR = ThreadPoolExecutor(max_workers=4, thread_name_prefix='batch')
+MAX_BATCH_SIZE = 50
 
-def validate_youtube_url(url):
+# Size of the pieces forwarded to the client when streaming a download
+STREAM_CHUNK_SIZE = 64 * 1024
+# Streams last as long as the client takes to receive them, so they are
+# limited separately from YTDL_MAX_JOBS, leaving request threads (32 in
+# gunicorn.conf.py) for the other routes
+STREAM_MAX_JOBS = 16
+_stream_slots = threading.BoundedSemaphore(STREAM_MAX_JOBS)
+
+
+def parse_youtube_url(url):
     """
-    Validate if the provided URL is a valid YouTube URL
+    Validate a YouTube video URL and extract its video ID in one pass
     
     Args:
         url (str): The URL to validate
         
     Returns:
-        bool: True if valid YouTube URL, False otherwise
+        str or None: The 11-character video ID, or None if the URL is not
+            a valid YouTube video URL
+    """
+    match = _YOUTUBE_URL_RE.match(url)
+    return match.group('id') if match else None
+
+
+def canonical_video_url(video_id):
+    """
+    Build the plain watch URL of a video
+    
+    yt-dlp is always given this URL rather than the one the user pasted, so
+    that e.g. a watch?v=...&list=... link is not extracted as a playlist
+    and the cached info really belongs to the video ID.
+    
+    Args:
+        video_id (str): The 11-character video ID
+        
+    Returns:
+        str: The watch URL of the video
+    """
+    return 'https://www.youtube.com/watch?v=' + video_id
+
+
+@contextmanager
+def borrow_ydl(profile):
+    """
+    Borrow a YoutubeDL instance for the given option profile
+    
+    An idle instance is reused when available, otherwise a new one is
+    created. The instance is returned to the pool when the block exits.
+    
+    Args:
+        profile (str): One of the keys of YDL_PROFILES
+        
+    Yields:
+        yt_dlp.YoutubeDL: An instance configured for the profile
+    """
+    with _idle_ydl_lock:
+        idle = _idle_ydl[profile]
+        ydl = idle.pop() if idle else None
+    if ydl is None:
+        # YoutubeDL keeps (and writes into) the dict it is given as params
+        ydl = yt_dlp.YoutubeDL(copy.deepcopy(YDL_PROFILES[profile]))
+        if profile == 'video' and av:
+            ydl.add_post_processor(AvRemuxPP(ydl), when='post_process')
+    try:
+        yield ydl
+    finally:
+        with _idle_ydl_lock:
+            _idle_ydl[profile].append(ydl)
+
+
+@contextmanager
+def track_download():
+    """
+    Create a job directory for a download and register the download as in
+    progress for the duration of the block, so the sweeper keeps its files
+    
+    Separate directories keep yt-dlp from treating an earlier download with
+    the same title as already downloaded, and concurrent jobs from writing
+    the same .part file.
+    
+    Yields:
+        str: Path of the new job directory inside DOWNLOAD_FOLDER
+    """
+    job_dir = os.path.join(DOWNLOAD_FOLDER, secrets.token_hex(8))
+    key = os.path.abspath(job_dir)
+    # Registered before creation so the sweeper never sees it unregistered
+    with _download_files_lock:
+        _active_downloads.add(key)
+    try:
+        os.mkdir(job_dir)
+        yield job_dir
+    finally:
+        with _download_files_lock:
+            _active_downloads.discard(key)
+
+
+def set_ydl_format(ydl, format_spec):
+    """
+    Change the format selection of an existing YoutubeDL instance
+    
+    yt-dlp compiles the format selector once in its constructor, so
+    updating params['format'] alone has no effect.
+    
+    Args:
+        ydl (yt_dlp.YoutubeDL): The instance to update
+        format_spec (str or None): A yt-dlp format specification,
+            or None for yt-dlp's default selection
     """
-    youtube_regex = r'^(https?://)?(www\.)?(youtube\.com|youtu\.be)/.+$'
-    return re.match(youtube_regex, url) is not None
+    ydl.params['format'] = format_spec
+    ydl.format_selector = ydl.build_format_selector(format_spec) if format_spec else None
+
+
+def cache_dns_lookups(maxsize=256, ttl=300):
+    """
+    Cache socket.getaddrinfo results for a few minutes so repeated lookups
+    of the YouTube and googlevideo hosts skip the resolver
+    
+    Entries expire after ttl seconds so address changes are picked up
+    by long-running processes.
+    
+    Args:
+        maxsize (int): Maximum number of cached lookups
+        ttl (int): Seconds a lookup result is reused
+    """
+    socket.getaddrinfo = cached(TTLCache(maxsize=maxsize, ttl=ttl), lock=threading.Lock())(socket.getaddrinfo)
+
+
+cache_dns_lookups()
 
 
 def sanitize_filename(filename):
@@ -44,10 +396,449 @@ def sanitize_filename(filename):
     Returns:
         str: Sanitized filename safe for file system
     """
-    # Remove invalid characters
-    filename = re.sub(r'[<>:"/\\|?*]', '', filename)
-    # Limit length to 200 characters
-    return filename[:200]
+    # Remove invalid characters and limit length to 200 characters
+    return filename.translate(_INVALID_FILENAME_CHARS)[:200]
+
+
+@dataclass
+class VideoFormat:
+    """
+    A downloadable format as sent to the frontend
+    
+    Uses __slots__ since every video info response holds dozens of these;
+    orjson serializes dataclasses as JSON objects natively.
+    """
+    __slots__ = ('format_id', 'quality', 'ext', 'filesize', 'filesize_mb', 'has_audio', 'height')
+
+    format_id: str
+    quality: str
+    ext: str
+    filesize: int
+    filesize_mb: float
+    has_audio: bool
+    height: Optional[int]  # None for audio-only formats
+
+
+def format_entry(f):
+    """
+    Convert a yt-dlp format dict into the format sent to the frontend
+    
+    Only formats with a valid URL, an mp4/webm container and a known file
+    size are kept: videos of at least 144p and audio-only streams.
+    
+    Args:
+        f (dict): A yt-dlp format dict
+        
+    Returns:
+        VideoFormat or None: The frontend format, or None if it is filtered out
+    """
+    get = f.get
+    if not get('url'):
+        return None
+    ext = get('ext', 'mp4')
+    if ext != 'mp4' and ext != 'webm':
+        return None
+    filesize = get('filesize') or get('filesize_approx')
+    if not filesize:
+        return None
+    vcodec = get('vcodec', 'none')
+    acodec = get('acodec', 'none')
+    height = get('height')
+    # Video formats (has video, height >= 144)
+    if vcodec != 'none' and height and height >= 144:
+        return VideoFormat(get('format_id'), f"{height}p", ext, filesize,
+                           filesize / 1048576, acodec != 'none', height)
+    # Audio-only formats (no video, has audio)
+    if vcodec == 'none' and acodec != 'none':
+        return VideoFormat(get('format_id'), 'audio', ext, filesize,
+                           filesize / 1048576, True, None)
+    return None
+
+
+def fetch_video_info(video_id, full=False):
+    """
+    Extract video information with yt-dlp and cache the result
+    
+    Runs on YTDL_EXECUTOR.
+    
+    Args:
+        video_id (str): The video ID used as cache key
+        full (bool): Query all of yt-dlp's default player clients
+        
+    Returns:
+        dict: Cache entry with the raw yt-dlp info dict under 'info' and
+            the video information for the frontend under 'video_info'
+    """
+    with _ytdl_slots, borrow_ydl('info_full' if full else 'info') as ydl:
+        info = ydl.extract_info(canonical_video_url(video_id), download=False)
+        
+        # Debug: Log the first formats returned by yt-dlp
+        if logger.isEnabledFor(logging.DEBUG):
+            all_formats = info.get('formats', [])
+            logger.debug('yt-dlp returned %d formats', len(all_formats))
+            for f in all_formats[:10]:
+                logger.debug('  - id: %s, ext: %s, height: %s, vcodec: %s, acodec: %s, filesize: %s',
+                             f.get('format_id'), f.get('ext'), f.get('height'),
+                             f.get('vcodec'), f.get('acodec'), f.get('filesize'))
+        
+        # Get available formats in a single pass, video by height desc
+        # followed by audio-only formats
+        available = [item for item in map(format_entry, info.get('formats', ())) if item is not None]
+        formats = [item for item in available if item.height is not None]
+        formats.sort(key=attrgetter('height'), reverse=True)
+        formats.extend(item for item in available if item.height is None)
+
+        if logger.isEnabledFor(logging.DEBUG):
+            logger.debug('Filtered formats for frontend: %d', len(formats))
+            for fmt in formats:
+                logger.debug('  - %s (%s) - Audio: %s - Height: %s',
+                             fmt.quality, fmt.ext, fmt.has_audio, fmt.height)
+
+        # Prepare response data
+        video_info = {
+            'title': info.get('title', 'Unknown Title'),
+            'thumbnail': info.get('thumbnail', ''),
+            'duration': info.get('duration', 0),
+            'channel': info.get('uploader', 'Unknown Channel'),
+            'view_count': info.get('view_count', 0),
+            'formats': formats,  # Send all available formats
+        }
+
+        entry = {'info': info, 'video_info': video_info, 'full': full}
+        with _video_info_cache_lock:
+            # A narrow extraction finishing late must not replace a full one
+            current = VIDEO_INFO_CACHE.get(video_id)
+            if full or current is None or not current['full']:
+                VIDEO_INFO_CACHE[video_id] = entry
+
+        return entry
+
+
+def submit_video_info(video_id, full=False):
+    """
+    Schedule fetch_video_info, joining an extraction already in progress
+    for the same video
+    
+    Args:
+        video_id (str): The video ID used as cache key
+        full (bool): Query all of yt-dlp's default player clients
+        
+    Returns:
+        Future: Resolves to the cache entry returned by fetch_video_info
+    """
+    key = (video_id, full)
+    with _inflight_info_lock:
+        future = _inflight_info.get(key)
+        if future is not None:
+            return future
+        future = YTDL_EXECUTOR.submit(fetch_video_info, video_id, full)
+        _inflight_info[key] = future
+
+    # Registered outside the lock: the callback runs right away if the
+    # job has already finished
+    future.add_done_callback(functools.partial(_forget_inflight, _inflight_info, _inflight_info_lock, key))
+    return future
+
+
+def _forget_inflight(inflight, lock, key, future):
+    with lock:
+        if inflight.get(key) is future:
+            del inflight[key]
+
+
+def download_media(video_id, download_format, format_id):
+    """
+    Download video or audio into a new job directory in DOWNLOAD_FOLDER
+    
+    Runs on YTDL_EXECUTOR.
+    
+    Args:
+        video_id (str): The video ID used as cache key
+        download_format (str): 'video' or 'audio'
+        format_id (str or None): yt-dlp format ID or specification for
+            video downloads
+        
+    Returns:
+        str: Path of the downloaded file
+    """
+    if download_format == 'audio':
+        profile = 'audio'
+    else:
+        profile = 'video'
+    with _video_info_cache_lock:
+        cached = VIDEO_INFO_CACHE.get(video_id)
+
+    with track_download() as job_dir, _ytdl_slots, borrow_ydl(profile) as ydl:
+        ydl.params['paths'] = {'home': job_dir}
+        ydl.params['extractor_args'] = copy.deepcopy(YOUTUBE_EXTRACTOR_ARGS)
+        if profile == 'video':
+            # Video download with selected format_id
+            set_ydl_format(ydl, format_id)
+        info = None
+        # Only a single video's info can be downloaded as-is; a playlist
+        # result would download every entry
+        if cached is not None and cached['info'].get('_type', 'video') == 'video':
+            # Reuse the metadata fetched by /api/video-info instead of
+            # downloading the webpage and player again, like --load-info-json
+            try:
+                info = ydl.process_ie_result(
+                    ydl.sanitize_info(cached['info'], remove_private_keys=True), download=True)
+            except yt_dlp.utils.DownloadError as e:
+                # Most likely the cached format URLs have expired
+                logger.info('Download from cached info failed (%s), extracting again', e)
+        if info is None:
+            # Formats picked from a ?full=1 lookup may only be offered by
+            # yt-dlp's default player clients
+            full = cached is not None and cached['full']
+            if full:
+                ydl.params['extractor_args'] = {}
+            try:
+                info = ydl.extract_info(canonical_video_url(video_id), download=True)
+            except yt_dlp.utils.DownloadError as e:
+                if full or profile == 'audio' or not format_id:
+                    raise
+                # e.g. the format is not available from the iOS client
+                logger.info('Download with the iOS client failed (%s), trying the default clients', e)
+                ydl.params['extractor_args'] = {}
+                info = ydl.extract_info(canonical_video_url(video_id), download=True)
+        # yt-dlp records the final path, after merging and postprocessing
+        downloads = info.get('requested_downloads')
+        if downloads and downloads[0].get('filepath'):
+            return downloads[0]['filepath']
+        return ydl.prepare_filename(info)
+
+
+def submit_download(video_id, download_format, format_id):
+    """
+    Schedule download_media, joining a download already in progress for
+    the same video and format
+    
+    Args:
+        video_id (str): The video ID used as cache key
+        download_format (str): 'video' or 'audio'
+        format_id (str or None): yt-dlp format ID or specification for
+            video downloads
+        
+    Returns:
+        Future: Resolves to the path returned by download_media
+    """
+    key = (video_id, download_format, format_id)
+    with _inflight_downloads_lock:
+        future = _inflight_downloads.get(key)
+        if future is not None:
+            return future
+        future = YTDL_EXECUTOR.submit(download_media, video_id, download_format, format_id)
+        _inflight_downloads[key] = future
+
+    future.add_done_callback(functools.partial(_forget_inflight, _inflight_downloads, _inflight_downloads_lock, key))
+    return future
+
+
+def download_batch_item(video_id, download_format, format_spec):
+    """
+    Download one video of a batch and keep the file until it is fetched
+    
+    Runs on BATCH_EXECUTOR.
+    
+    Args:
+        video_id (str): The video ID
+        download_format (str): 'video' or 'audio'
+        format_spec (str or None): yt-dlp format specification for videos
+        
+    Returns:
+        str: Path of the downloaded file
+    """
+    filepath = download_media(video_id, download_format, format_spec)
+    with _download_files_lock:
+        _unfetched_files[os.path.abspath(os.path.dirname(filepath))] = time.time() + BATCH_FILE_MAX_AGE
+    return filepath
+
+
+def forget_video_info(video_id):
+    """
+    Drop the cached metadata of a video
+    
+    Args:
+        video_id (str): The video ID used as cache key
+    """
+    with _video_info_cache_lock:
+        VIDEO_INFO_CACHE.pop(video_id, None)
+
+
+def is_streamable(fmt):
+    """
+    Check whether a format can be proxied to the client as-is
+    
+    Only single-file formats that already contain both audio and video and
+    are served over plain HTTP qualify; anything else needs ffmpeg.
+    
+    Args:
+        fmt (dict): A yt-dlp format dict
+        
+    Returns:
+        bool: True if the format can be streamed directly
+    """
+    return (fmt.get('protocol') in ('http', 'https')
+            and fmt.get('vcodec', 'none') != 'none'
+            and fmt.get('acodec', 'none') != 'none')
+
+
+def stream_format(fmt, video_id):
+    """
+    Forward the bytes of a format from YouTube to the client
+    
+    When the exact size is known the file is fetched in ranges of yt-dlp's
+    http_chunk_size, since YouTube throttles long single requests.
+    
+    Args:
+        fmt (dict): A streamable yt-dlp format dict
+        video_id (str): Cache key to drop once the transfer completes
+        
+    Yields:
+        bytes: Chunks of the media file
+    """
+    filesize = fmt.get('filesize')
+    chunk_size = (fmt.get('downloader_options') or {}).get('http_chunk_size') or filesize
+    if filesize:
+        ranges = [(start, min(start + chunk_size, filesize) - 1)
+                  for start in range(0, filesize, chunk_size)]
+    else:
+        ranges = [None]
+
+    # The transfer keeps its YoutubeDL instance until the last byte is sent
+    with _stream_slots, borrow_ydl('info') as ydl:
+        for byte_range in ranges:
+            headers = dict(fmt.get('http_headers') or {})
+            if byte_range:
+                headers['Range'] = 'bytes=%d-%d' % byte_range
+            response = ydl.urlopen(Request(fmt['url'], headers=headers))
+            try:
+                while True:
+                    data = response.read(STREAM_CHUNK_SIZE)
+                    if not data:
+                        break
+                    yield data
+            finally:
+                response.close()
+
+    forget_video_info(video_id)
+
+
+def attachment_header(filename):
+    """
+    Build Content-Disposition parameters for a file download
+    
+    Non-ASCII names get an ASCII fallback plus an RFC 5987 filename*.
+    
+    Args:
+        filename (str): Name the browser should save the file as
+        
+    Returns:
+        dict: Parameters for headers.set('Content-Disposition', 'attachment', ...)
+    """
+    try:
+        filename.encode('ascii')
+    except UnicodeEncodeError:
+        simple = unicodedata.normalize('NFKD', filename).encode('ascii', 'ignore').decode('ascii')
+        return {'filename': simple, 'filename*': "UTF-8''" + quote(filename, safe="!#$&+-.^_`|~")}
+    return {'filename': filename}
+
+
+def download_path(filepath):
+    """
+    Get the path of a downloaded file relative to DOWNLOAD_FOLDER, as used
+    in /api/files URLs and X-Accel-Redirect
+    
+    Args:
+        filepath (str): Path of the file inside DOWNLOAD_FOLDER
+        
+    Returns:
+        str: The relative path with forward slashes
+    """
+    return Path(os.path.relpath(filepath, DOWNLOAD_FOLDER)).as_posix()
+
+
+def send_download(filepath):
+    """
+    Send a downloaded file to the user
+    
+    With X_ACCEL_REDIRECT_PREFIX set, nginx sends the file instead.
+    Files are deleted later by the download sweeper.
+    
+    Args:
+        filepath (str): Path of the file inside DOWNLOAD_FOLDER
+        
+    Returns:
+        Response: File download response
+    """
+    filename = os.path.basename(filepath)
+    if X_ACCEL_REDIRECT_PREFIX:
+        response = Response(mimetype=mimetypes.guess_type(filename)[0] or 'application/octet-stream')
+        response.headers['X-Accel-Redirect'] = X_ACCEL_REDIRECT_PREFIX + quote(download_path(filepath))
+        response.headers.set('Content-Disposition', 'attachment', **attachment_header(filename))
+        return response
+
+    return send_file(
+        filepath,
+        as_attachment=True,
+        download_name=filename
+    )
+
+
+def sweep_downloads():
+    """
+    Periodically delete job directories in DOWNLOAD_FOLDER older than
+    DOWNLOAD_MAX_AGE
+    
+    Directories of downloads in progress and of batch files that have not
+    been fetched yet are skipped. Runs forever on a daemon thread, so
+    request workers never wait on file deletion.
+    """
+    while True:
+        now = time.time()
+        cutoff = now - DOWNLOAD_MAX_AGE
+        with _download_files_lock:
+            for job_dir, expiry in list(_unfetched_files.items()):
+                if expiry <= now:
+                    del _unfetched_files[job_dir]
+            held = _active_downloads | set(_unfetched_files)
+        for path in Path(DOWNLOAD_FOLDER).iterdir():
+            try:
+                if os.path.abspath(path) in held or path.stat().st_mtime >= cutoff:
+                    continue
+                # A job directory's mtime is that of its last finished file
+                if path.is_dir():
+                    shutil.rmtree(path)
+                else:
+                    path.unlink()
+            except OSError as e:
+                # Already gone, or still open on Windows; retry next sweep
+                logger.debug('Could not remove %s: %s', path, e)
+        time.sleep(SWEEP_INTERVAL)
+
+
+threading.Thread(target=sweep_downloads, name='download-sweeper', daemon=True).start()
+
+
+def video_info_response(video_info):
+    """
+    Build a cacheable JSON response for video information
+    
+    The ETag is a BLAKE2 hash of the body, so a conditional GET whose
+    If-None-Match matches gets an empty 304 response.
+    
+    Args:
+        video_info (dict): Video information to send to the frontend
+        
+    Returns:
+        Response: JSON response with ETag and Cache-Control headers
+    """
+    body = orjson.dumps(video_info)
+    response = app.response_class(body, mimetype='application/json')
+    response.set_etag(hashlib.blake2b(body, digest_size=8).hexdigest())
+    response.cache_control.public = True
+    response.cache_control.max_age = VIDEO_INFO_MAX_AGE
+    return response.make_conditional(request)
 
 
 @app.route('/')
@@ -61,115 +852,55 @@ def index():
     return render_template('index.html')
 
 
-@app.route('/api/video-info', methods=['POST'])
+@app.route('/api/video-info', methods=['GET', 'POST'])
 def get_video_info():
     """
     Fetch video information from YouTube URL
     
-    Expected JSON input:
+    Expected input, as query string for GET or JSON for POST:
         {
-            "url": "https://youtube.com/watch?v=..."
+            "url": "https://youtube.com/watch?v=...",
+            "full": "1"  // optional, query every player client for more formats
         }
         
+    GET responses carry an ETag and may be cached by browsers and proxies.
+        
     Returns:
         JSON with video information or error message
     """
     try:
         # Get URL from request
-        data = request.get_json()
+        if request.method == 'GET':
+            data = request.args
+        else:
+            data = request.get_json()
         url = data.get('url', '').strip()
+        full = str(data.get('full', '')).lower() in ('1', 'true')
         
         # Validate URL
         if not url:
             return jsonify({'error': 'URL is required'}), 400
         
-        if not validate_youtube_url(url):
+        video_id = parse_youtube_url(url)
+        if not video_id:
             return jsonify({'error': 'Invalid YouTube URL'}), 400
         
-        # Configure yt-dlp options for fetching info only
-        # Try multiple strategies to get maximum format availability
-        ydl_opts = {
-            'quiet': True,
-            'no_warnings': True,
-            'extract_flat': False,
-            'user_agent': 'Mozilla/5.0 (Windows NT 10.0; Win64; x64) AppleWebKit/537.36 (KHTML, like Gecko) Chrome/120.0.0.0 Safari/537.36',
-            'nocheckcertificate': True,
-            'age_limit': None,
-            'format': 'all',
-        }
+        # Serve repeated lookups for the same video from the cache
+        with _video_info_cache_lock:
+            cached = VIDEO_INFO_CACHE.get(video_id)
+        # A full lookup cannot be answered from a narrower cached one
+        if cached is not None and (cached['full'] or not full):
+            return video_info_response(cached['video_info'])
         
-        # Extract video information
-        with yt_dlp.YoutubeDL(ydl_opts) as ydl:
-            info = ydl.extract_info(url, download=False)
-            
-            # Debug: Print ALL formats returned by yt-dlp
-            all_formats = info.get('formats', [])
-            print(f"\n🟢 yt-dlp returned {len(all_formats)} formats:")
-            for f in all_formats[:10]:  # Print first 10
-                print(f"  - id: {f.get('format_id')}, ext: {f.get('ext')}, height: {f.get('height')}, "
-                      f"vcodec: {f.get('vcodec')}, acodec: {f.get('acodec')}, filesize: {f.get('filesize')}")
-            
-            # Get available formats - be more inclusive to see ALL qualities
+        # Extract video information on the yt-dlp executor. If it takes too
+        # long, give up waiting; the job keeps running and fills the cache.
+        future = submit_video_info(video_id, full)
+        try:
+            video_info = future.result(timeout=VIDEO_INFO_TIMEOUT)['video_info']
+        except FuturesTimeoutError:
+            return jsonify({'error': 'Fetching video info is taking longer than usual, please try again shortly'}), 504
 
-
-
-            formats = []
-            for f in info.get('formats', []):
-                # Only include formats with a valid URL and ext mp4/webm and filesize
-                if not f.get('url'):
-                    continue
-                ext = f.get('ext', 'mp4')
-                if ext not in ['mp4', 'webm']:
-                    continue
-                filesize = f.get('filesize') or f.get('filesize_approx')
-                if not filesize:
-                    continue
-                vcodec = f.get('vcodec', 'none')
-                acodec = f.get('acodec', 'none')
-                height = f.get('height')
-                format_id = f.get('format_id')
-                # Video formats (has video, height >= 144)
-                if vcodec != 'none' and height and height >= 144:
-                    quality = f"{height}p"
-                    has_audio = acodec != 'none'
-                    formats.append({
-                        'format_id': format_id,
-                        'quality': quality,
-                        'ext': ext,
-                        'filesize': filesize,
-                        'filesize_mb': round(filesize / (1024 * 1024), 2),
-                        'has_audio': has_audio,
-                        'height': height
-                    })
-                # Audio-only formats (no video, has audio)
-                elif vcodec == 'none' and acodec != 'none':
-                    formats.append({
-                        'format_id': format_id,
-                        'quality': 'audio',
-                        'ext': ext,
-                        'filesize': filesize,
-                        'filesize_mb': round(filesize / (1024 * 1024), 2),
-                        'has_audio': True,
-                        'height': None
-                    })
-            # Sort: video by height desc, audio by filesize desc
-            formats.sort(key=lambda x: (x['height'] or 0), reverse=True)
-
-            print(f"\n📊 Filtered formats for frontend: {len(formats)}")
-            for fmt in formats:
-                print(f"   - {fmt['quality']} ({fmt['ext']}) - Audio: {fmt['has_audio']} - Height: {fmt['height']}")
-
-            # Prepare response data
-            video_info = {
-                'title': info.get('title', 'Unknown Title'),
-                'thumbnail': info.get('thumbnail', ''),
-                'duration': info.get('duration', 0),
-                'channel': info.get('uploader', 'Unknown Channel'),
-                'view_count': info.get('view_count', 0),
-                'formats': formats,  # Send all available formats
-            }
-
-            return jsonify(video_info), 200
+        return video_info_response(video_info)
             
     except Exception as e:
         return jsonify({'error': f'Failed to fetch video info: {str(e)}'}), 500
@@ -197,222 +928,162 @@ def download_video():
         download_format = data.get('format', 'video')  # 'video' or 'audio'
         format_id = data.get('format_id')
 
-        print(f"\n{'='*50}")
-        print(f"Download Request:")
-        print(f"URL: {url}")
-        print(f"Format: {download_format}")
-        print(f"Format ID: {format_id}")
-        print(f"{'='*50}\n")
+        logger.info('Download request: url=%s format=%s format_id=%s',
+                    url, download_format, format_id)
 
         # Validate URL
         if not url:
             return jsonify({'error': 'URL is required'}), 400
 
-        if not validate_youtube_url(url):
+        video_id = parse_youtube_url(url)
+        if not video_id:
             return jsonify({'error': 'Invalid YouTube URL'}), 400
 
-        # Configure download options based on format
-        if download_format == 'audio':
-            # Audio-only download (MP3)
-            ydl_opts = {
-                'format': 'bestaudio/best',
-                'postprocessors': [{
-                    'key': 'FFmpegExtractAudio',
-                    'preferredcodec': 'mp3',
-                    'preferredquality': '192',
-                }],
-                'outtmpl': os.path.join(DOWNLOAD_FOLDER, '%(title)s.%(ext)s'),
-                'quiet': False,
-                'user_agent': 'Mozilla/5.0 (Windows NT 10.0; Win64; x64) AppleWebKit/537.36 (KHTML, like Gecko) Chrome/120.0.0.0 Safari/537.36',
-                'nocheckcertificate': True,
-                'age_limit': None,
-            }
-        else:
-            # Video download with selected format_id
-            ydl_opts = {
-                'format': format_id,
-                'outtmpl': os.path.join(DOWNLOAD_FOLDER, '%(title)s.%(ext)s'),
-                'merge_output_format': 'mp4',
-                'quiet': False,
-                'verbose': True,
-                'user_agent': 'Mozilla/5.0 (Windows NT 10.0; Win64; x64) AppleWebKit/537.36 (KHTML, like Gecko) Chrome/120.0.0.0 Safari/537.36',
-                'nocheckcertificate': True,
-                'age_limit': None,
-                'postprocessors': [{
-                    'key': 'FFmpegVideoConvertor',
-                    'preferedformat': 'mp4',
-                }],
-            }
-
-        # Download the video/audio
-        with yt_dlp.YoutubeDL(ydl_opts) as ydl:
-            # Extract info to get the final filename
-            info = ydl.extract_info(url, download=True)
-
-            # Construct the filename
-            if download_format == 'audio':
-                ext = '.mp3'
-            else:
-                # Get extension from info or fallback to .mp4
-                ext = '.' + (info.get('ext') or 'mp4')
-            base_name = sanitize_filename(info['title'])
-            # Find the correct file (yt-dlp may append extra info)
-            # Find all files that start with base_name and end with ext (no trailing underscores or .part)
-            possible_files = [f for f in os.listdir(DOWNLOAD_FOLDER)
-                             if f.startswith(base_name) and f.endswith(ext) and not f.endswith(ext + '_') and not f.endswith('.part')]
-            if possible_files:
-                # Pick the shortest filename (most likely correct)
-                filename = min(possible_files, key=len)
-                filepath = os.path.join(DOWNLOAD_FOLDER, filename)
-            else:
-                # Fallback to original logic
-                filename = base_name + ext
-                filepath = os.path.join(DOWNLOAD_FOLDER, filename)
-                if not os.path.exists(filepath):
-                    return jsonify({'error': 'Download completed but file not found'}), 500
-
-            # If filename ends with .mp4_ or .webm_, rename to .mp4 or .webm
-            if filename.endswith('.mp4_'):
-                new_filename = filename[:-1]
-                new_filepath = os.path.join(DOWNLOAD_FOLDER, new_filename)
-                os.rename(filepath, new_filepath)
-                filename = new_filename
-                filepath = new_filepath
-            elif filename.endswith('.webm_'):
-                new_filename = filename[:-1]
-                new_filepath = os.path.join(DOWNLOAD_FOLDER, new_filename)
-                os.rename(filepath, new_filepath)
-                filename = new_filename
-                filepath = new_filepath
-
-            # Send file to user
-            response = send_file(
-                filepath,
-                as_attachment=True,
-                download_name=filename
-            )
-
-            # Delete file after sending (cleanup)
-            @response.call_on_close
-            def cleanup():
+        # Formats that already contain audio and video are streamed straight
+        # from YouTube, without going through DOWNLOAD_FOLDER
+        if download_format != 'audio' and format_id:
+            with _video_info_cache_lock:
+                entry = VIDEO_INFO_CACHE.get(video_id)
+            if entry is None:
                 try:
-                    if os.path.exists(filepath):
-                        os.remove(filepath)
-                except Exception as e:
-                    print(f"Error cleaning up file: {e}")
+                    entry = submit_video_info(video_id).result(timeout=VIDEO_INFO_TIMEOUT)
+                except FuturesTimeoutError:
+                    return jsonify({'error': 'Fetching video info is taking longer than usual, please try again shortly'}), 504
+            info = entry['info']
+            fmt = next((f for f in info.get('formats', []) if f.get('format_id') == format_id), None)
+            if fmt is not None and is_streamable(fmt):
+                ext = fmt.get('ext') or 'mp4'
+                filename = sanitize_filename(info.get('title') or 'video') + '.' + ext
+                response = Response(
+                    stream_format(fmt, video_id),
+                    mimetype=mimetypes.guess_type(filename)[0] or 'application/octet-stream',
+                )
+                response.headers.set('Content-Disposition', 'attachment', **attachment_header(filename))
+                if fmt.get('filesize'):
+                    response.content_length = fmt['filesize']
+                return response
+
+        # Download the video/audio on the yt-dlp executor, giving up waiting
+        # after DOWNLOAD_TIMEOUT so the request thread is released. The job
+        # keeps running and a retry waits for it instead of starting over.
+        try:
+            filepath = submit_download(video_id, download_format, format_id).result(timeout=DOWNLOAD_TIMEOUT)
+        except FuturesTimeoutError:
+            return jsonify({'error': 'The download is taking too long, please try again later'}), 504
+        if not os.path.exists(filepath):
+            return jsonify({'error': 'Download completed but file not found'}), 500
+
+        # Send file to user
+        response = send_download(filepath)
+
+        # Drop the cached metadata once the video has been downloaded
+        forget_video_info(video_id)
 
-            return response
+        return response
 
     except Exception as e:
-        print(f"Format ID: {format_id}")
-        print(f"{'='*50}\n")
+        return jsonify({'error': f'Download failed: {str(e)}'}), 500
 
-        # Validate URL
-        if not url:
-            return jsonify({'error': 'URL is required'}), 400
 
-        if not validate_youtube_url(url):
-            return jsonify({'error': 'Invalid YouTube URL'}), 400
+@app.route('/api/batch-download', methods=['POST'])
+def batch_download():
+    """
+    Download several videos or audios in parallel
+    
+    Expected JSON input:
+        {
+            "urls": ["https://youtube.com/watch?v=...", ...],
+            "format": "video",  // or "audio"
+            "quality": "720p"   // optional, for video only
+        }
+        
+    Returns:
+        Newline-delimited JSON, one line per URL as its download finishes:
+        {"url": ..., "status": "done", "filename": ..., "download_url": ...}
+        or {"url": ..., "status": "error", "error": ...}
+    """
+    try:
+        data = request.get_json()
+        urls = data.get('urls')
+        download_format = data.get('format', 'video')  # 'video' or 'audio'
+        quality = data.get('quality')
 
-        # Configure download options based on format
-        if download_format == 'audio':
-            # Audio-only download (MP3)
-            ydl_opts = {
-                'format': 'bestaudio/best',
-                'postprocessors': [{
-                    'key': 'FFmpegExtractAudio',
-                    'preferredcodec': 'mp3',
-                    'preferredquality': '192',
-                }],
-                'outtmpl': os.path.join(DOWNLOAD_FOLDER, '%(title)s.%(ext)s'),
-                'quiet': False,
-                'user_agent': 'Mozilla/5.0 (Windows NT 10.0; Win64; x64) AppleWebKit/537.36 (KHTML, like Gecko) Chrome/120.0.0.0 Safari/537.36',
-                'nocheckcertificate': True,
-                'age_limit': None,
-            }
-        else:
-            # Video download with selected format_id
-            ydl_opts = {
-                'format': format_id,
-                'outtmpl': os.path.join(DOWNLOAD_FOLDER, '%(title)s.%(ext)s'),
-                'merge_output_format': 'mp4',
-                'quiet': False,
-                'verbose': True,
-                'user_agent': 'Mozilla/5.0 (Windows NT 10.0; Win64; x64) AppleWebKit/537.36 (KHTML, like Gecko) Chrome/120.0.0.0 Safari/537.36',
-                'nocheckcertificate': True,
-                'age_limit': None,
-                'postprocessors': [{
-                    'key': 'FFmpegVideoConvertor',
-                    'preferedformat': 'mp4',
-                }],
-            }
-
-        # Download the video/audio
-        with yt_dlp.YoutubeDL(ydl_opts) as ydl:
-            # Extract info to get the final filename
-            info = ydl.extract_info(url, download=True)
-
-            # Construct the filename
-            if download_format == 'audio':
-                ext = '.mp3'
-            else:
-                # Get extension from info or fallback to .mp4
-                ext = '.' + (info.get('ext') or 'mp4')
-            base_name = sanitize_filename(info['title'])
-            # Find the correct file (yt-dlp may append extra info)
-            # Find all files that start with base_name and end with ext (no trailing underscores or .part)
-            possible_files = [f for f in os.listdir(DOWNLOAD_FOLDER)
-                             if f.startswith(base_name) and f.endswith(ext) and not f.endswith(ext + '_') and not f.endswith('.part')]
-            if possible_files:
-                # Pick the shortest filename (most likely correct)
-                filename = min(possible_files, key=len)
-                filepath = os.path.join(DOWNLOAD_FOLDER, filename)
-            else:
-                # Fallback to original logic
-                filename = base_name + ext
-                filepath = os.path.join(DOWNLOAD_FOLDER, filename)
-                if not os.path.exists(filepath):
-                    return jsonify({'error': 'Download completed but file not found'}), 500
-
-            # If filename ends with .mp4_ or .webm_, rename to .mp4 or .webm
-            if filename.endswith('.mp4_'):
-                new_filename = filename[:-1]
-                new_filepath = os.path.join(DOWNLOAD_FOLDER, new_filename)
-                os.rename(filepath, new_filepath)
-                filename = new_filename
-                filepath = new_filepath
-            elif filename.endswith('.webm_'):
-                new_filename = filename[:-1]
-                new_filepath = os.path.join(DOWNLOAD_FOLDER, new_filename)
-                os.rename(filepath, new_filepath)
-                filename = new_filename
-                filepath = new_filepath
-
-            # Send file to user
-            response = send_file(
-                filepath,
-                as_attachment=True,
-                download_name=filename
-            )
-
-            # Delete file after sending (cleanup)
-            @response.call_on_close
-            def cleanup():
-                try:
-                    if os.path.exists(filepath):
-                        os.remove(filepath)
-                except Exception as e:
-                    print(f"Error cleaning up file: {e}")
+        # Validate URLs
+        if not urls or not isinstance(urls, list):
+            return jsonify({'error': 'A list of URLs is required'}), 400
+
+        if len(urls) > MAX_BATCH_SIZE:
+            return jsonify({'error': f'At most {MAX_BATCH_SIZE} URLs per batch'}), 400
+
+        # URLs of the same video share one download
+        videos = {}
+        for url in urls:
+            url = str(url).strip()
+            video_id = parse_youtube_url(url)
+            if not video_id:
+                return jsonify({'error': f'Invalid YouTube URL: {url}'}), 400
+            videos.setdefault(video_id, []).append(url)
+
+        # Pick the best video up to the requested height
+        format_spec = None
+        if download_format != 'audio' and quality:
+            match = _QUALITY_RE.match(str(quality))
+            if not match:
+                return jsonify({'error': f'Invalid quality: {quality}, expected e.g. "720p"'}), 400
+            height = int(match.group(1))
+            format_spec = f'bestvideo[height<={height}]+bestaudio/best[height<={height}]'
 
-            return response
+        futures = {
+            BATCH_EXECUTOR.submit(download_batch_item, video_id, download_format, format_spec): video_id
+            for video_id in videos
+        }
 
     except Exception as e:
-        return jsonify({'error': f'Download failed: {str(e)}'}), 500
+        return jsonify({'error': f'Batch download failed: {str(e)}'}), 500
+
+    def generate():
+        for future in as_completed(futures):
+            video_id = futures[future]
+            try:
+                filepath = future.result()
+            except Exception as e:
+                result = {'status': 'error', 'error': str(e)}
+            else:
+                forget_video_info(video_id)
+                result = {
+                    'status': 'done',
+                    'filename': os.path.basename(filepath),
+                    'download_url': '/api/files/' + quote(download_path(filepath)),
+                }
+            for url in videos[video_id]:
+                yield app.json.dumps({'url': url, **result}) + '\n'
+
+    return Response(generate(), mimetype='application/x-ndjson')
+
+
+@app.route('/api/files/<path:filename>')
+def download_file(filename):
+    """
+    Send a file downloaded by a batch
+    
+    Returns:
+        File download or error message
+    """
+    filepath = safe_join(DOWNLOAD_FOLDER, filename)
+    if filepath is None or not os.path.isfile(filepath):
+        return jsonify({'error': 'File not found'}), 404
+    # Fetched, so the sweeper may delete it once it is old enough
+    with _download_files_lock:
+        _unfetched_files.pop(os.path.abspath(os.path.dirname(filepath)), None)
+    return send_download(filepath)
 
 
 # Run the Flask app
 if __name__ == '__main__':
+    logging.basicConfig(level=logging.INFO)
     print("🚀 Starting YouTube Downloader Server...")
     print("📍 Open your browser and go to: http://localhost:5000")
     print("⏹️  Press CTRL+C to stop the server\n")
-    app.run(debug=True, port=5000)
\ No newline at end of file
+    # Development server only, see gunicorn.conf.py for production.
+    # Set FLASK_DEBUG=1 to enable the debugger and reloader.
+    app.run(debug=os.environ.get('FLASK_DEBUG') == '1', port=5000)
\ No newline at end of file
@@ -0,0 +1,17 @@
+"""
+Gunicorn configuration for the YouTube Downloader
+Usage: gunicorn app:app
+"""
+
+bind = '0.0.0.0:5000'
+
+# A single process keeps the video info cache, the pooled YoutubeDL instances
+# and the yt-dlp thread pools shared between all requests. The work is I/O
+# bound, so threads provide the concurrency.
+workers = 1
+worker_class = 'gthread'
+threads = 32
+
+# Downloads of long videos (plus ffmpeg merging) can take several minutes
+timeout = 600
+graceful_timeout = 30
@@ -223,14 +223,8 @@ async function fetchVideoInfo() {
     setButtonLoading(fetchBtn, true);
     
     try {
-        // Make API request to backend
-        const response = await fetch('/api/video-info', {
-            method: 'POST',
-            headers: {
-                'Content-Type': 'application/json',
-            },
-            body: JSON.stringify({ url: url })
-        });
+        // Make API request to backend (GET so the browser can cache it)
+        const response = await fetch(`/api/video-info?url=${encodeURIComponent(url)}`);
         
         const data = await response.json();
         